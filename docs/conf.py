@@ -1,9 +1,7 @@
 # Configuration file for the Sphinx documentation builder.
 # Vollständige Doku: https://www.sphinx-doc.org/en/master/usage/configuration.html
 
-import os
-import sys
-sys.path.insert(0, os.path.abspath('..'))
+from pathlib import Path
 
 # -- Projektinformationen ----------------------------------------------------
 project = 'planets_dealer_pipeline'
@@ -14,7 +12,7 @@ language = 'de'
 
 # -- Erweiterungen -----------------------------------------------------------
 extensions = [
-    'sphinx.ext.autodoc',
+    'autoapi.extension',
     'sphinx.ext.autosectionlabel',
     'sphinx.ext.intersphinx',
     'sphinx.ext.napoleon',
@@ -23,6 +21,15 @@ extensions = [
 ]
 
 autosectionlabel_prefix_document = True
+
+# -- AutoAPI -----------------------------------------------------------------
+# Die API-Doku wird statisch aus dem Quellcode gelesen; der Projektcode wird
+# beim Build nicht importiert. Die Modulseiten werden manuell über
+# ``autoapimodule`` eingebunden, daher keine automatisch generierten Seiten.
+autoapi_type = 'python'
+autoapi_dirs = [str(Path(__file__).parent.parent / 'src'), str(Path(__file__).parent.parent / 'tests')]
+autoapi_generate_api_docs = False
+autoapi_add_toctree_entry = False
 intersphinx_mapping = {
     'python': ('https://docs.python.org/3', None),
 }
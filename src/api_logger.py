@@ -1,11 +1,150 @@
 # src/api_logger.py
 import requests
 import pandas as pd
-import io
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import re
-from typing import Dict, Any, Optional
+import time
+import shutil
+import hashlib
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional
 
 API_URL: str = "https://exoplanetarchive.ipac.caltech.edu/TAP/sync"
+TAP_CACHE_DIR: Path = Path(__file__).parent.parent / 'data' / 'tap_cache'
+TAP_CACHE_MAX_AGE_SECONDS: int = 24 * 60 * 60
+_STREAM_CHUNK_SIZE: int = 1024 * 1024
+_WS_RE: re.Pattern = re.compile(r'\s+')
+
+# Header columns of the TAP responses, in query order; a response with another header is rejected
+_PLANET_API_COLS: List[str] = [
+    'hostname', 'pl_name', 'disc_year', 'pl_orbper', 'pl_orbsmax', 'pl_rade', 'pl_masse',
+    'pl_orbeccen', 'pl_eqt', 'pl_insol'
+]
+_STAR_API_COLS: List[str] = ['system_key', 'star_name', 'st_teff', 'st_lum', 'st_age', 'st_met']
+
+# Measurements are stored as REAL (float4) in the database, so float32 is sufficient in memory
+_PLANET_FLOAT_COLS: List[str] = [
+    'orbital_period_days', 'orbit_semi_major_axis_au', 'planet_radius_earth_radii',
+    'planet_mass_earth_masses', 'orbit_eccentricity', 'equilibrium_temperature_k',
+    'insolation_flux_earth_flux'
+]
+_STAR_FLOAT_COLS: List[str] = ['st_teff', 'st_lum', 'st_age', 'st_met']
+# Host/system names repeat across rows (multi-planet and multi-star systems); stored as category
+_PLANET_CATEGORY_COLS: List[str] = ['star_name_api']
+_STAR_CATEGORY_COLS: List[str] = ['system_key']
+
+
+def _build_session() -> requests.Session:
+    """
+    Creates a shared HTTP session for all TAP requests.
+
+    The session keeps connections to the archive alive between calls, so
+    subsequent queries reuse the existing TCP/TLS connection. Transient
+    server errors (5xx) are retried with a short backoff. Compressed transfer
+    is requested explicitly; requests decompresses the body transparently.
+
+    :return: A configured requests Session.
+    :rtype: requests.Session
+    """
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": "planets_dealer/1.0", "Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+_SESSION: requests.Session = _build_session()
+
+
+def _fetch_tap_file(query: str, timeout: int, fmt: str = "csv",
+                    expected_columns: Optional[List[str]] = None) -> Optional[Path]:
+    """
+    Returns the path of a local file holding the result of an ADQL query.
+
+    Responses are stored under ``TAP_CACHE_DIR`` keyed by the SHA-1 of the query
+    and the output format.
+    A cached file younger than ``TAP_CACHE_MAX_AGE_SECONDS`` is reused without any
+    network access. Otherwise the query is sent to the TAP service and the response
+    body is streamed chunk-wise into the cache file, so the payload is never held
+    in memory as a whole. The body is only stored as a cache entry if its header
+    line matches ``expected_columns``, so an error document or maintenance page
+    returned with HTTP 200 is never reused.
+
+    :param query: The ADQL query to execute.
+    :type query: str
+    :param timeout: The request timeout in seconds.
+    :type timeout: int
+    :param fmt: The TAP output format ('csv' or 'tsv').
+    :type fmt: str
+    :param expected_columns: The column names the header line must list, or None to skip the check.
+    :type expected_columns: Optional[List[str]]
+    :raises requests.exceptions.RequestException: If the HTTP request fails.
+    :raises ValueError: If the response header does not match ``expected_columns``.
+    :raises OSError: If the cache file cannot be written.
+    :return: The path to the result file, or None if the service returned an empty body.
+    :rtype: Optional[Path]
+    """
+    cache_path: Path = TAP_CACHE_DIR / f"{hashlib.sha1(f'{fmt}:{query}'.encode('utf-8')).hexdigest()}.{fmt}"
+    if cache_path.exists() and time.time() - cache_path.stat().st_mtime < TAP_CACHE_MAX_AGE_SECONDS:
+        print(f"Using cached TAP response '{cache_path.name}'.")
+        return cache_path
+
+    params: Dict[str, Any] = {"query": query, "format": fmt}
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path: Path = cache_path.with_suffix('.tmp')
+    try:
+        with _SESSION.get(API_URL, params=params, timeout=timeout, stream=True) as r:
+            r.raise_for_status()
+            r.raw.decode_content = True
+            with open(tmp_path, 'wb') as f:
+                shutil.copyfileobj(r.raw, f, _STREAM_CHUNK_SIZE)
+
+        with open(tmp_path, 'rb') as f:
+            header: bytes = f.readline(_STREAM_CHUNK_SIZE)
+            is_empty: bool = not header.strip() and not f.read(_STREAM_CHUNK_SIZE).strip()
+        if is_empty:
+            return None
+        if expected_columns is not None:
+            delimiter: str = "\t" if fmt == "tsv" else ","
+            columns: List[str] = [c.strip().strip('"').lower()
+                                  for c in header.decode('utf-8', errors='replace').split(delimiter)]
+            if columns != [c.lower() for c in expected_columns]:
+                raise ValueError(f"Unexpected TAP response header: {header[:200]!r}")
+        tmp_path.replace(cache_path)
+        return cache_path
+    finally:
+        # Never leave a partial or rejected download behind
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def _read_tap_csv(csv_path: Path, delimiter: str = ",") -> pd.DataFrame:
+    """
+    Parses a CSV/TSV file from the TAP service with PyArrow's multithreaded reader.
+
+    Empty cells are treated as missing values, as pandas does. TSV input is
+    read without quote handling, which lets the parser skip the quoting state
+    machine entirely.
+
+    :param csv_path: The path to the CSV/TSV file.
+    :type csv_path: Path
+    :param delimiter: The field delimiter (',' for CSV, '\\t' for TSV).
+    :type delimiter: str
+    :return: The parsed DataFrame.
+    :rtype: pd.DataFrame
+    """
+    table: pa.Table = pacsv.read_csv(
+        str(csv_path),
+        read_options=pacsv.ReadOptions(use_threads=True),
+        parse_options=pacsv.ParseOptions(delimiter=delimiter, quote_char='"' if delimiter == "," else False),
+        convert_options=pacsv.ConvertOptions(strings_can_be_null=True)
+    )
+    return table.to_pandas()
+
 
 def fetch_exoplanets(limit: Optional[int] = 100) -> pd.DataFrame:
     """
@@ -24,17 +163,20 @@ def fetch_exoplanets(limit: Optional[int] = 100) -> pd.DataFrame:
             pl_orbeccen, pl_eqt, pl_insol
         FROM PSCompPars
     """
-    query = re.sub(r'\s+', ' ', query).strip()
-    params: Dict[str, Any] = {"query": query, "format": "csv"}
+    query = _WS_RE.sub(' ', query).strip()
     print(f"Fetching System & Planet data (PSCompPars) from NASA API{' with limit ' + str(limit) if limit and limit > 0 else ' (all data)'}...")
     try:
         timeout_seconds = 60 if limit and limit > 0 else 300
-        r: requests.Response = requests.get(API_URL, params=params, timeout=timeout_seconds)
-        r.raise_for_status()
-        if not r.text.strip():
+        csv_path: Optional[Path] = _fetch_tap_file(query, timeout_seconds, expected_columns=_PLANET_API_COLS)
+        if csv_path is None:
             print("Warning: Empty response from NASA API (PSCompPars).")
             return pd.DataFrame()
-        df: pd.DataFrame = pd.read_csv(io.StringIO(r.text))
+        try:
+            df: pd.DataFrame = _read_tap_csv(csv_path)
+        except Exception:
+            # An unparsable response must not be served from the cache on the next run
+            csv_path.unlink(missing_ok=True)
+            raise
         print(f"{len(df)} rows fetched from PSCompPars API.")
         rename_map = {
             'hostname': 'star_name_api', 'disc_year': 'discovery_year',
@@ -44,6 +186,13 @@ def fetch_exoplanets(limit: Optional[int] = 100) -> pd.DataFrame:
             'pl_insol': 'insolation_flux_earth_flux'
         }
         df.rename(columns=rename_map, inplace=True)
+        float_cols: List[str] = [col for col in _PLANET_FLOAT_COLS if col in df.columns]
+        df[float_cols] = df[float_cols].astype('float32')
+        category_cols: List[str] = [col for col in _PLANET_CATEGORY_COLS if col in df.columns]
+        df[category_cols] = df[category_cols].astype('category')
+        if 'discovery_year' in df.columns:
+            # Nullable integer matching the SMALLINT column: missing years stay <NA> instead of float64
+            df['discovery_year'] = df['discovery_year'].astype('Int16')
         return df
     except Exception as e:
         print(f"Error fetching NASA data (PSCompPars): {e}")
@@ -54,31 +203,38 @@ def fetch_stellar_hosts() -> pd.DataFrame:
     Fetches aggregated star data from the NASA Exoplanet Archive (stellarhosts table).
 
     Uses GROUP BY on sy_name and hostname, and AVG() on stellar parameters
-    to ensure a unique, averaged entry for each star.
+    to ensure a unique, averaged entry for each star. The key columns are
+    aliased to their internal names directly in the ADQL query.
 
-    :return: A DataFrame containing unique stars, with columns renamed for internal use.
+    :return: A DataFrame containing unique stars, with columns named for internal use.
     :rtype: pd.DataFrame
     """
     query: str = """
         SELECT
-            sy_name, hostname,
+            sy_name AS system_key, hostname AS star_name,
             AVG(st_teff) as st_teff, AVG(st_lum) as st_lum,
             AVG(st_age) as st_age, AVG(st_met) as st_met
         FROM stellarhosts
         GROUP BY sy_name, hostname
     """
-    params: Dict[str, Any] = {"query": query, "format": "csv"}
     print("Fetching aggregated star data (stellarhosts via GROUP BY) from NASA API...")
     try:
-        r: requests.Response = requests.get(API_URL, params=params, timeout=120)
-        r.raise_for_status()
-        if not r.text.strip():
+        csv_path: Optional[Path] = _fetch_tap_file(query, 120, fmt="tsv", expected_columns=_STAR_API_COLS)
+        if csv_path is None:
             print("Warning: Empty response from NASA API (stellarhosts).")
             return pd.DataFrame()
-        df: pd.DataFrame = pd.read_csv(io.StringIO(r.text))
-        df_renamed: pd.DataFrame = df.rename(columns={'sy_name': 'system_key', 'hostname': 'star_name'})
-        print(f"{len(df_renamed)} unique stars fetched from stellarhosts API.")
-        return df_renamed
+        try:
+            df: pd.DataFrame = _read_tap_csv(csv_path, delimiter="\t")
+        except Exception:
+            # An unparsable response must not be served from the cache on the next run
+            csv_path.unlink(missing_ok=True)
+            raise
+        float_cols: List[str] = [col for col in _STAR_FLOAT_COLS if col in df.columns]
+        df[float_cols] = df[float_cols].astype('float32')
+        category_cols: List[str] = [col for col in _STAR_CATEGORY_COLS if col in df.columns]
+        df[category_cols] = df[category_cols].astype('category')
+        print(f"{len(df)} unique stars fetched from stellarhosts API.")
+        return df
     except Exception as e:
         print(f"Error fetching stellarhosts data: {e}")
         return pd.DataFrame()
\ No newline at end of file
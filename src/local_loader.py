@@ -1,15 +1,59 @@
 # src/local_loader.py
+import csv
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+# Explizite Spaltentypen für hwc.csv: keine Typ-Inferenz, float32 für Messwerte
+# und Dictionary-Encoding (pandas 'category') für stark repetitive Textspalten
+_HWC_COLUMN_TYPES: Dict[str, pa.DataType] = {
+    "P_NAME": pa.string(),
+    "P_ESI": pa.float32(),
+    "P_DETECTION": pa.dictionary(pa.int32(), pa.string()),
+    "P_DISCOVERY_FACILITY": pa.dictionary(pa.int32(), pa.string()),
+    "S_CONSTELLATION_ENG": pa.dictionary(pa.int32(), pa.string()),
+    "S_DISTANCE": pa.float32(),
+    "S_HZ_CON_MIN": pa.float32(),
+    "S_HZ_CON_MAX": pa.float32(),
+    "S_HZ_OPT_MIN": pa.float32(),
+    "S_HZ_OPT_MAX": pa.float32(),
+}
+
+
+def _read_parquet_cache(pq_path: Path, csv_path: Path, columns: List[str]) -> Optional[pd.DataFrame]:
+    """
+    Reads the Parquet copy of the local CSV if it is at least as new as the CSV.
+
+    :param pq_path: The path to the Parquet cache file.
+    :type pq_path: Path
+    :param csv_path: The path to the source CSV file.
+    :type csv_path: Path
+    :param columns: The (renamed) columns that must be present in the cache.
+    :type columns: List[str]
+    :return: The cached DataFrame, or None if the cache is missing, stale or unreadable.
+    :rtype: Optional[pd.DataFrame]
+    """
+    if not pq_path.exists() or pq_path.stat().st_mtime < csv_path.stat().st_mtime:
+        return None
+    try:
+        return pq.read_table(pq_path, columns=columns).to_pandas()
+    except Exception as e:
+        print(f"Warnung: Parquet-Cache '{pq_path}' konnte nicht gelesen werden. Lese CSV neu. Fehler: {e}")
+        return None
+
 
 def load_local_data(csv_path: Path) -> pd.DataFrame:
     """
     Loads supplementary data from the local 'hwc.csv' file.
 
-    This function reads the specified CSV file, selects a predefined
-    set of columns, renames them to the internal standard names,
-    and returns them as a DataFrame.
+    This function reads the specified CSV file with PyArrow, materializing
+    only a predefined set of columns, renames them to the internal standard
+    names, and returns them as a DataFrame. The result is cached next to the
+    CSV as a Parquet file, which is used instead of the CSV as long as it is
+    not older than the CSV.
 
     :param csv_path: The file path to the 'hwc.csv' file.
     :type csv_path: Path
@@ -20,7 +64,6 @@ def load_local_data(csv_path: Path) -> pd.DataFrame:
     """
     print(f"Lade ergänzende Daten aus '{csv_path}'...")
     try:
-        df: pd.DataFrame = pd.read_csv(csv_path)
         needed_cols_mapping: Dict[str, str] = {
             # Original CSV Name : Final English DataFrame Name
             "P_NAME": "pl_name_local", # Used for merging
@@ -35,12 +78,36 @@ def load_local_data(csv_path: Path) -> pd.DataFrame:
             "S_HZ_OPT_MAX": "hz_optimistic_outer_au"
         }
         original_needed_cols = list(needed_cols_mapping.keys())
-        all_cols_in_df: List[str] = df.columns.tolist()
-        missing_cols: List[str] = [col for col in original_needed_cols if col not in all_cols_in_df]
+        pq_path: Path = csv_path.with_suffix('.parquet')
+        df_cached: Optional[pd.DataFrame] = _read_parquet_cache(
+            pq_path, csv_path, list(needed_cols_mapping.values()))
+        if df_cached is not None:
+            print(f"{len(df_cached)} Zeilen aus Parquet-Cache '{pq_path.name}' geladen.")
+            return df_cached
+
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            all_cols_in_csv: List[str] = next(csv.reader(f), [])
+        missing_cols: List[str] = [col for col in original_needed_cols if col not in all_cols_in_csv]
         if missing_cols:
              raise KeyError(f"Fehlende Spalten in '{csv_path.name}': {missing_cols}.")
 
-        df_renamed: pd.DataFrame = df[original_needed_cols].rename(columns=needed_cols_mapping)
+        # Nur die benötigten Spalten werden geparst und konvertiert
+        table: pa.Table = pacsv.read_csv(
+            str(csv_path),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=original_needed_cols, column_types=_HWC_COLUMN_TYPES, strings_can_be_null=True)
+        )
+        table = table.rename_columns([needed_cols_mapping[col] for col in table.column_names])
+        # Erst unter temporärem Namen schreiben und dann atomar umbenennen, damit ein abgebrochener
+        # Lauf keinen abgeschnittenen Cache hinterlässt, der neuer als die CSV ist
+        tmp_path: Path = pq_path.with_name(pq_path.name + '.tmp')
+        try:
+            pq.write_table(table, tmp_path, compression='snappy')
+            tmp_path.replace(pq_path)
+        except Exception as e:
+            print(f"Warnung: Parquet-Cache '{pq_path}' konnte nicht geschrieben werden. Fehler: {e}")
+            tmp_path.unlink(missing_ok=True)
+        df_renamed: pd.DataFrame = table.to_pandas()
         print(f"{len(df_renamed)} Zeilen aus lokaler CSV geladen.")
         return df_renamed
     except FileNotFoundError:
@@ -1,6 +1,9 @@
 # src/pipeline.py
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from typing import Optional, List
 
@@ -14,6 +17,27 @@ from .save_data import save_normalized_to_db, DatabaseError
 BASE_DIR: Path = Path(__file__).parent.parent
 load_dotenv(BASE_DIR / '.env')
 
+# Zeichen, die beim Normalisieren von Planetennamen entfernt werden (Whitespace und Bindestriche)
+_STRIP_PATTERN: str = r'[\s-]+'
+
+
+def _normalize_planet_names(names: pd.Series) -> pd.Series:
+    """
+    Builds the normalized merge key for a Series of planet names.
+
+    Lowercases the names and removes whitespace and hyphens using PyArrow
+    compute kernels, which run in C++ over the Arrow buffers without
+    iterating Python strings.
+
+    :param names: The planet names to normalize.
+    :type names: pd.Series
+    :return: The normalized names.
+    :rtype: pd.Series
+    """
+    arr: pa.Array = pa.array(names.astype('string'), type=pa.string(), from_pandas=True)
+    normalized: pa.Array = pc.replace_substring_regex(pc.utf8_lower(arr), pattern=_STRIP_PATTERN, replacement='')
+    return normalized.to_pandas().set_axis(names.index).rename(names.name)
+
 
 def run_pipeline(limit: Optional[int] = 100):
     """
@@ -29,22 +53,42 @@ def run_pipeline(limit: Optional[int] = 100):
                   If 0 or None, fetches all available rows.
     :type limit: Optional[int]
     """
+    # Strings aus CSV-Reads als Arrow-gestützte Strings ablegen (Standard ab pandas 3.0), damit
+    # .str-Operationen und Merge-Hashing vektorisiert laufen. Nur für die Dauer des Laufs gesetzt,
+    # damit ein bloßer Import des Moduls die globale pandas-Konfiguration nicht verändert
+    with pd.option_context('future.infer_string', True):
+        _run_pipeline_steps(limit)
+
+
+def _run_pipeline_steps(limit: Optional[int]):
+    """
+    Runs the Extract, Transform and Load steps of :func:`run_pipeline`.
+
+    :param limit: The maximum number of rows to fetch from the planet API.
+    :type limit: Optional[int]
+    """
     print(f"Starte Exoplaneten ETL-Pipeline (Modular, 5 Tabellen) mit Limit={limit if limit else 'None'}...")
 
     # ==============================================================
     # 1. EXTRACT
     # ==============================================================
-    df_nasa: pd.DataFrame = fetch_exoplanets(limit=limit)
+    # Die drei Quellen sind unabhängig voneinander und werden parallel geladen
+    local_csv_path: Path = BASE_DIR / 'data' / 'hwc.csv'
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        future_nasa = executor.submit(fetch_exoplanets, limit=limit)
+        future_local = executor.submit(load_local_data, local_csv_path)
+        future_stars = executor.submit(fetch_stellar_hosts)
+        df_nasa: pd.DataFrame = future_nasa.result()
+        df_local: pd.DataFrame = future_local.result()
+        df_stars_api: pd.DataFrame = future_stars.result()
+
     if df_nasa.empty:
         print("Pipeline gestoppt: Keine Primärdaten von NASA API (PSCompPars) erhalten.")
         return
 
-    local_csv_path: Path = BASE_DIR / 'data' / 'hwc.csv'
-    df_local: pd.DataFrame = load_local_data(local_csv_path)
     if df_local.empty:
         print("Warnung: Lokale Zusatzdaten (hwc.csv) konnten nicht geladen werden oder sind leer. Fahre ohne sie fort.")
 
-    df_stars_api: pd.DataFrame = fetch_stellar_hosts()
     if df_stars_api.empty:
         print("Pipeline gestoppt: Keine Sterndaten (stellarhosts) von API erhalten.")
         return
@@ -57,33 +101,50 @@ def run_pipeline(limit: Optional[int] = 100):
         return
 
     # Erstelle normalisierten Merge-Schlüssel für API-Daten
-    df_nasa['pl_name_norm'] = df_nasa['pl_name'].astype(str).str.lower().str.replace(r'[\s-]+', '', regex=True)
+    df_nasa['pl_name_norm'] = _normalize_planet_names(df_nasa['pl_name'])
 
     df_merged = df_nasa  # Beginne mit den NASA-Daten
 
     # Führe Merge nur durch, wenn lokale Daten vorhanden UND gültig sind
     if not df_local.empty and 'pl_name_local' in df_local.columns:
-        df_local['pl_name_norm'] = df_local['pl_name_local'].astype(str).str.lower().str.replace(r'[\s-]+', '',
-                                                                                                 regex=True)
+        df_local['pl_name_norm'] = _normalize_planet_names(df_local['pl_name_local'])
         print(f"Merge NASA-Daten ({len(df_nasa)}) mit lokalen Daten ({len(df_local)})...")
 
-        # Wähle nur Spalten aus df_local aus, die nicht schon in df_nasa sind (außer dem Merge-Schlüssel)
-        cols_to_merge = df_local.columns.difference(df_nasa.columns).tolist() + ['pl_name_norm']
-        if 'pl_name_local' in cols_to_merge:
-            cols_to_merge.remove('pl_name_local')  # Redundante Namensspalte entfernen
-
-        df_merged = pd.merge(df_nasa, df_local[cols_to_merge], on='pl_name_norm', how='left')
+        # Entferne aus df_local die redundante Namensspalte und alle Spalten, die schon in df_nasa sind
+        # (außer dem Merge-Schlüssel)
+        cols_to_drop: List[str] = ['pl_name_local'] + [
+            col for col in df_local.columns if col in df_nasa.columns and col != 'pl_name_norm']
+
+        # Gemeinsamer Categorical-Typ für den Schlüssel: der Join hasht Integer-Codes statt Strings
+        key_dtype = pd.CategoricalDtype(
+            categories=pd.Index(df_nasa['pl_name_norm'].dropna().unique()).union(
+                pd.Index(df_local['pl_name_norm'].dropna().unique())))
+        df_nasa['pl_name_norm'] = df_nasa['pl_name_norm'].astype(key_dtype)
+        df_local['pl_name_norm'] = df_local['pl_name_norm'].astype(key_dtype)
+
+        # Lookup-Join statt Merge: lokale Daten nach Schlüssel indexieren (erster Treffer gewinnt, wie
+        # beim späteren DISTINCT ON in der DB) und per reindex in einem Hash-Durchlauf den NASA-Zeilen
+        # zuordnen; die Spalten werden direkt in df_nasa übernommen, ohne Merge-Zwischenframe
+        local_by_key: pd.DataFrame = (df_local.drop(columns=cols_to_drop, errors='ignore')
+                                      .drop_duplicates(subset='pl_name_norm')
+                                      .set_index('pl_name_norm'))
+        df_nasa[local_by_key.columns] = local_by_key.reindex(df_nasa['pl_name_norm']).set_axis(df_nasa.index)
+        df_merged = df_nasa
     else:
         print("Fahre nur mit NASA API-Daten fort (keine lokalen Daten gemerged).")
 
     # Räume Merge-Schlüssel auf
     df_merged = df_merged.drop(columns=[col for col in ['pl_name_norm'] if col in df_merged.columns], errors='ignore')
     print(f"Merge abgeschlossen. Resultierender DataFrame hat {len(df_merged)} Zeilen.")
+    # Quell-DataFrames werden nicht mehr benötigt; Referenzen freigeben, um den Speicher-Peak
+    # während Scraping und DB-Load zu senken
+    del df_nasa, df_local
 
     # ==============================================================
     # 3. TRANSFORM (SCRAPING)
     # ==============================================================
     df_enriched: pd.DataFrame = add_planet_type(df_merged)
+    del df_merged
 
     # ==============================================================
     # 4. LOAD
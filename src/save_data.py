@@ -1,15 +1,108 @@
 # src/save_data.py
 import os
+import tempfile
+import threading
 import psycopg2
 import pandas as pd
 from psycopg2.extras import execute_values
 from psycopg2.errors import UndefinedTable
-from typing import List, Tuple, Dict, Optional
+from psycopg2.pool import ThreadedConnectionPool
+from typing import Any, List, Tuple, Dict, Optional
 
 
 class DatabaseError(Exception): pass
 
 
+# COPY buffers larger than this are spilled from memory to a temporary file
+_COPY_SPOOL_MAX_BYTES: int = 64 * 1024 * 1024
+
+
+# Per-transaction memory for the load: DISTINCT ON sorts (work_mem) and the primary key /
+# index builds after the load (maintenance_work_mem) stay in memory instead of spilling to disk
+_LOAD_WORK_MEM: str = '64MB'
+_LOAD_MAINTENANCE_WORK_MEM: str = '256MB'
+
+# Version of the table definitions in _create_tables_if_missing; bump it whenever they change.
+# It is stored as the comment of the planets table, and a load recreates an older schema.
+_SCHEMA_VERSION: int = 2
+_SCHEMA_COMMENT: str = f'planets_dealer schema v{_SCHEMA_VERSION}'
+
+# Default rows per execute_values page; overridable via the EXECUTE_VALUES_PAGE_SIZE environment variable
+EXECUTE_VALUES_PAGE_SIZE: int = 1000
+
+# Integer columns in the database (INTEGER ids, SMALLINT discovery_year) and the matching nullable
+# dtype they are cast to (if still float) so COPY receives "2020", not "2020.0"
+_INTEGER_COLUMNS: Dict[str, str] = {'method_id': 'Int32', 'facility_id': 'Int32', 'discovery_year': 'Int16'}
+
+# Connection pools per set of connection parameters, created on first use
+_POOL_MAX_CONNECTIONS: int = 8
+_POOLS: Dict[Tuple, ThreadedConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _get_connection_pool() -> ThreadedConnectionPool:
+    """
+    Returns the connection pool for the connection parameters currently set in the environment.
+
+    Pools are created lazily and cached per parameter set, so repeated
+    ``ExoplanetDBPostgres`` instances reuse open connections instead of
+    performing a new connect/authentication handshake each time.
+
+    :return: The (possibly newly created) connection pool.
+    :rtype: ThreadedConnectionPool
+    """
+    params: Dict[str, Any] = {
+        'dbname': os.environ.get('DB_NAME'), 'user': os.environ.get('DB_USER'),
+        'password': os.environ.get('DB_PASSWORD'), 'host': os.environ.get('DB_HOST'),
+        'port': os.environ.get('DB_PORT', 5432)
+    }
+    key: Tuple = tuple(sorted(params.items()))
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            _POOLS[key] = ThreadedConnectionPool(1, _POOL_MAX_CONNECTIONS, **params)
+        return _POOLS[key]
+
+
+def _execute_values_page_size() -> int:
+    """
+    Returns the execute_values page size configured in the environment.
+
+    :raises DatabaseError: If ``EXECUTE_VALUES_PAGE_SIZE`` is not a positive integer.
+    :return: The value of ``EXECUTE_VALUES_PAGE_SIZE``, or the module default if it is not set.
+    :rtype: int
+    """
+    raw_value: Optional[str] = os.environ.get('EXECUTE_VALUES_PAGE_SIZE')
+    if raw_value is None or not raw_value.strip():
+        return EXECUTE_VALUES_PAGE_SIZE
+    try:
+        page_size = int(raw_value)
+    except ValueError:
+        page_size = 0
+    if page_size <= 0:
+        raise DatabaseError(f"EXECUTE_VALUES_PAGE_SIZE must be a positive integer, got {raw_value!r}.")
+    return page_size
+
+
+def _map_lookup_ids(names: pd.Series, id_map: Dict[str, int]) -> pd.Series:
+    """
+    Maps a low-cardinality name column to its lookup ids via the category codes.
+
+    The id is resolved once per distinct name; each row then only indexes an
+    integer array with its category code instead of hashing its string.
+    Missing or unknown names become <NA>.
+
+    :param names: The name column (e.g. 'detection_method_name').
+    :type names: pd.Series
+    :param id_map: The mapping from name to lookup id.
+    :type id_map: Dict[str, int]
+    :return: The lookup ids as a nullable Int32 Series aligned with ``names``.
+    :rtype: pd.Series
+    """
+    categories: pd.Series = names.astype('category')
+    ids = pd.array([id_map.get(name) for name in categories.cat.categories], dtype='Int32')
+    return pd.Series(ids.take(categories.cat.codes.to_numpy(), allow_fill=True), index=names.index, name=names.name)
+
+
 class ExoplanetDBPostgres:
     """
     Handles all database interactions for the Exoplanet ETL pipeline.
@@ -19,21 +112,20 @@ class ExoplanetDBPostgres:
     """
 
     def __init__(self):
-        """Initializes the database connection and cursor."""
+        """Takes a database connection from the connection pool and opens a cursor."""
         self.connection: Optional[psycopg2.extensions.connection] = None
         self.cursor: Optional[psycopg2.extensions.cursor] = None
+        self._pool: Optional[ThreadedConnectionPool] = None
         try:
-            self.connection = psycopg2.connect(
-                dbname=os.environ.get('DB_NAME'), user=os.environ.get('DB_USER'),
-                password=os.environ.get('DB_PASSWORD'), host=os.environ.get('DB_HOST'),
-                port=os.environ.get('DB_PORT', 5432)
-            )
+            self._pool = _get_connection_pool()
+            self.connection = self._pool.getconn()
             self.cursor = self.connection.cursor()
             print(f"Successfully connected to DB '{os.environ.get('DB_NAME')}' on host '{os.environ.get('DB_HOST')}'.")
         except Exception as e:
             raise DatabaseError(f"Database connection failed: {e}")
 
-    def _execute_values(self, query: str, data_tuples: List[Tuple], page_size: int = 100):
+    def _execute_values(self, query: str, data_tuples: List[Tuple], page_size: Optional[int] = None,
+                        fetch: bool = False) -> List[Tuple]:
         """
         Executes a bulk INSERT statement using psycopg2's execute_values for efficiency.
 
@@ -41,20 +133,31 @@ class ExoplanetDBPostgres:
         :type query: str
         :param data_tuples: A list of tuples containing the data to insert.
         :type data_tuples: List[Tuple]
-        :param page_size: The number of rows to insert per network roundtrip.
-        :type page_size: int
+        :param page_size: The number of rows to insert per network roundtrip. Defaults to the
+                          ``EXECUTE_VALUES_PAGE_SIZE`` environment variable, or the module
+                          default ``EXECUTE_VALUES_PAGE_SIZE`` (1000) if it is not set.
+        :type page_size: Optional[int]
+        :param fetch: Whether to collect the rows produced by a RETURNING clause.
+        :type fetch: bool
+        :raises DatabaseError: If the page size is not a positive integer or the insert fails.
+        :return: The returned rows of all pages if ``fetch`` is True, otherwise an empty list.
+        :rtype: List[Tuple]
         """
-        if not data_tuples: return
+        if not data_tuples: return []
         if not self.cursor: raise DatabaseError("Cursor not available.")
+        if page_size is None:
+            page_size = _execute_values_page_size()
+        elif page_size <= 0:
+            raise DatabaseError(f"page_size must be a positive integer, got {page_size}.")
         try:
-            execute_values(self.cursor, query, data_tuples, page_size=page_size)
+            return execute_values(self.cursor, query, data_tuples, page_size=page_size, fetch=fetch) or []
         except Exception as e:
             if self.connection: self.connection.rollback()
             raise DatabaseError(f"Error executing bulk insert: {e}\nQuery Template: {query[:500]}...")
 
-    def _recreate_tables(self):
+    def _create_tables_if_missing(self, commit: bool = True):
         """
-        Drops all existing project tables, types, and recreates the 5-table schema.
+        Creates the planet_type_enum type and the 5-table schema where they do not exist yet.
 
         Schema:
         - discovery_facilities (Lookup)
@@ -62,53 +165,64 @@ class ExoplanetDBPostgres:
         - systems (Parent)
         - stars (Child of systems)
         - planets (Child of stars, detection_methods, discovery_facilities)
+
+        The main tables are created without primary and foreign keys so the bulk
+        load does not maintain indexes or check references row by row; the
+        constraints are added afterwards by :meth:`_add_constraints`. The
+        planets table is tagged with the current schema version (see
+        :meth:`_ensure_current_schema`).
+
+        :param commit: Whether to commit the schema change. :meth:`insert_data` passes
+                       False so it becomes part of its load transaction.
+        :type commit: bool
         """
         if not self.cursor or not self.connection: raise DatabaseError("No DB connection.")
         try:
-            print("Resetting table schema (DROP/CREATE)...")
-            self.cursor.execute("DROP TABLE IF EXISTS planets CASCADE;")
-            self.cursor.execute("DROP TABLE IF EXISTS stars CASCADE;")
-            self.cursor.execute("DROP TABLE IF EXISTS systems CASCADE;")
-            self.cursor.execute("DROP TABLE IF EXISTS detection_methods CASCADE;")
-            self.cursor.execute("DROP TABLE IF EXISTS discovery_facilities CASCADE;")
-            self.cursor.execute("DROP TYPE IF EXISTS planet_type_enum CASCADE;")
-
-            self.cursor.execute(
-                "CREATE TYPE planet_type_enum AS ENUM ('Neptune-like', 'terrestrial', 'gas giant', 'super Earth', 'Unknown');")
-            self.cursor.execute(
-                "CREATE TABLE discovery_facilities (facility_id SERIAL PRIMARY KEY, facility_name TEXT UNIQUE NOT NULL);")
-            self.cursor.execute(
-                "CREATE TABLE detection_methods (method_id SERIAL PRIMARY KEY, method_name TEXT UNIQUE NOT NULL);")
+            # All statements in one round trip (simple query protocol, no bound parameters)
             self.cursor.execute("""
-                                CREATE TABLE systems
+                                DO $$
+                                BEGIN
+                                    CREATE TYPE planet_type_enum AS ENUM ('Neptune-like', 'terrestrial', 'gas giant', 'super Earth', 'Unknown');
+                                EXCEPTION
+                                    WHEN duplicate_object THEN NULL;
+                                END $$;
+                                CREATE TABLE IF NOT EXISTS discovery_facilities
                                 (
-                                    system_key               TEXT PRIMARY KEY,
+                                    facility_id   SERIAL PRIMARY KEY,
+                                    facility_name TEXT UNIQUE NOT NULL
+                                );
+                                CREATE TABLE IF NOT EXISTS detection_methods
+                                (
+                                    method_id   SERIAL PRIMARY KEY,
+                                    method_name TEXT UNIQUE NOT NULL
+                                );
+                                CREATE TABLE IF NOT EXISTS systems
+                                (
+                                    system_key               TEXT,
                                     constellation_en         TEXT,
                                     distance_pc              REAL,
                                     hz_conservative_inner_au REAL,
                                     hz_conservative_outer_au REAL,
                                     hz_optimistic_inner_au   REAL,
                                     hz_optimistic_outer_au   REAL
-                                );""")
-            self.cursor.execute("""
-                                CREATE TABLE stars
+                                );
+                                CREATE TABLE IF NOT EXISTS stars
                                 (
-                                    star_name  TEXT PRIMARY KEY,
-                                    system_key TEXT REFERENCES systems (system_key) ON DELETE SET NULL,
+                                    star_name  TEXT,
+                                    system_key TEXT,
                                     st_teff    REAL,
                                     st_lum     REAL,
                                     st_age     REAL,
                                     st_met     REAL
-                                );""")
-            self.cursor.execute("""
-                                CREATE TABLE planets
+                                );
+                                CREATE TABLE IF NOT EXISTS planets
                                 (
-                                    pl_name                    TEXT PRIMARY KEY,
-                                    star_name                  TEXT    REFERENCES stars (star_name) ON DELETE SET NULL,
-                                    method_id                  INTEGER REFERENCES detection_methods (method_id) ON DELETE SET NULL,
-                                    facility_id                INTEGER REFERENCES discovery_facilities (facility_id) ON DELETE SET NULL,
+                                    pl_name                    TEXT,
+                                    star_name                  TEXT,
+                                    method_id                  INTEGER,
+                                    facility_id                INTEGER,
                                     planet_type                planet_type_enum,
-                                    discovery_year             INTEGER,
+                                    discovery_year             SMALLINT,
                                     orbital_period_days        REAL,
                                     orbit_semi_major_axis_au   REAL,
                                     planet_radius_earth_radii  REAL,
@@ -120,27 +234,163 @@ class ExoplanetDBPostgres:
                                     visualization_url          TEXT GENERATED ALWAYS AS (
                                         'https://eyes.nasa.gov/apps/exo/#/planet/' || replace(pl_name, ' ', '_')
                                         ) STORED
-                                );""")
-            self.connection.commit()
-            print("Tables created successfully.")
+                                );
+                                COMMENT ON TABLE planets IS %s;""", (_SCHEMA_COMMENT,))
+            if commit: self.connection.commit()
         except Exception as e:
             self.connection.rollback()
             raise DatabaseError(f"Error creating tables: {e}")
 
-    def _dataframe_to_tuples(self, df: pd.DataFrame) -> List[Tuple]:
+    def _recreate_tables(self, commit: bool = True):
+        """
+        Drops all existing project tables, types, and recreates the 5-table schema.
+
+        Needed when the schema definition itself changes; a regular load only
+        empties the existing tables (see :meth:`_truncate_tables`). Dependent
+        objects such as views are dropped as well (CASCADE).
+
+        :param commit: Whether to commit the schema change.
+        :type commit: bool
+        """
+        if not self.cursor or not self.connection: raise DatabaseError("No DB connection.")
+        try:
+            print("Resetting table schema (DROP/CREATE)...")
+            self.cursor.execute("""
+                                DROP TABLE IF EXISTS planets, stars, systems, detection_methods, discovery_facilities CASCADE;
+                                DROP TYPE IF EXISTS planet_type_enum CASCADE;""")
+        except Exception as e:
+            self.connection.rollback()
+            raise DatabaseError(f"Error dropping tables: {e}")
+        self._create_tables_if_missing(commit=commit)
+        print("Tables created successfully.")
+
+    def _ensure_current_schema(self):
         """
-        Converts a Pandas DataFrame to a list of tuples, replacing NaN/NA with None.
+        Creates the schema if it is missing and recreates it if it is outdated.
 
-        :param df: The DataFrame to convert.
+        Existing tables are only kept if the planets table carries the comment
+        of the current ``_SCHEMA_VERSION``. Otherwise (e.g. a database created
+        before a column type changed) the tables are dropped and recreated via
+        :meth:`_recreate_tables`. Nothing is committed; the caller's transaction
+        covers the change.
+        """
+        if not self.cursor or not self.connection: raise DatabaseError("No DB connection.")
+        try:
+            self.cursor.execute("SELECT to_regclass('planets') IS NOT NULL, obj_description(to_regclass('planets'), 'pg_class')")
+            planets_exists, schema_comment = self.cursor.fetchone()
+        except Exception as e:
+            self.connection.rollback()
+            raise DatabaseError(f"Error checking schema version: {e}")
+        if planets_exists and schema_comment != _SCHEMA_COMMENT:
+            print(f"Outdated table schema ({schema_comment or 'unversioned'}), expected {_SCHEMA_COMMENT}.")
+            self._recreate_tables(commit=False)
+        else:
+            self._create_tables_if_missing(commit=False)
+
+    def _truncate_tables(self):
+        """
+        Empties all project tables while keeping the schema and dependent objects (e.g. views).
+
+        The primary and foreign keys and the foreign key indexes left by the
+        previous load are dropped first, so the following bulk load again runs
+        without constraint checks or index maintenance, and the SERIAL ids of
+        the lookup tables restart at 1. Runs inside the caller's transaction.
+        """
+        if not self.cursor: raise DatabaseError("Cursor not available.")
+        print("Emptying tables (TRUNCATE)...")
+        self.cursor.execute("""
+                            ALTER TABLE planets
+                                DROP CONSTRAINT IF EXISTS planets_star_name_fkey,
+                                DROP CONSTRAINT IF EXISTS planets_method_id_fkey,
+                                DROP CONSTRAINT IF EXISTS planets_facility_id_fkey,
+                                DROP CONSTRAINT IF EXISTS planets_pkey;
+                            ALTER TABLE stars
+                                DROP CONSTRAINT IF EXISTS stars_system_key_fkey,
+                                DROP CONSTRAINT IF EXISTS stars_pkey;
+                            ALTER TABLE systems DROP CONSTRAINT IF EXISTS systems_pkey;
+                            DROP INDEX IF EXISTS stars_system_key_idx, planets_star_name_idx,
+                                planets_method_id_idx, planets_facility_id_idx;
+                            TRUNCATE planets, stars, systems, detection_methods, discovery_facilities RESTART IDENTITY;""")
+
+    def _add_constraints(self):
+        """
+        Adds the primary and foreign keys of the main tables and the indexes on
+        the foreign key columns after the bulk load.
+
+        Each constraint is validated and each index built once over the loaded
+        table instead of per inserted row. Runs inside the caller's transaction.
+        """
+        if not self.cursor: raise DatabaseError("Cursor not available.")
+        print("Adding primary and foreign keys...")
+        # Indexes on the foreign key columns serve joins and ON DELETE SET NULL lookups
+        self.cursor.execute("""
+                            ALTER TABLE systems ADD CONSTRAINT systems_pkey PRIMARY KEY (system_key);
+                            ALTER TABLE stars
+                                ADD CONSTRAINT stars_pkey PRIMARY KEY (star_name),
+                                ADD CONSTRAINT stars_system_key_fkey
+                                    FOREIGN KEY (system_key) REFERENCES systems (system_key) ON DELETE SET NULL;
+                            ALTER TABLE planets
+                                ADD CONSTRAINT planets_pkey PRIMARY KEY (pl_name),
+                                ADD CONSTRAINT planets_star_name_fkey
+                                    FOREIGN KEY (star_name) REFERENCES stars (star_name) ON DELETE SET NULL,
+                                ADD CONSTRAINT planets_method_id_fkey
+                                    FOREIGN KEY (method_id) REFERENCES detection_methods (method_id) ON DELETE SET NULL,
+                                ADD CONSTRAINT planets_facility_id_fkey
+                                    FOREIGN KEY (facility_id) REFERENCES discovery_facilities (facility_id) ON DELETE SET NULL;
+                            CREATE INDEX stars_system_key_idx ON stars (system_key);
+                            CREATE INDEX planets_star_name_idx ON planets (star_name);
+                            CREATE INDEX planets_method_id_idx ON planets (method_id);
+                            CREATE INDEX planets_facility_id_idx ON planets (facility_id);""")
+
+    def _copy_dataframe(self, table: str, df: pd.DataFrame):
+        """
+        Bulk-loads a DataFrame into a table using PostgreSQL's COPY FROM STDIN.
+
+        The DataFrame is serialized once into a CSV buffer (NaN/NA written as
+        ``\\N``) and streamed to the server in a single COPY command, replacing
+        per-row INSERT statements. The buffer stays in memory up to
+        ``_COPY_SPOOL_MAX_BYTES`` and is spilled to a temporary file beyond that.
+
+        :param table: The name of the target table.
+        :type table: str
+        :param df: The DataFrame to load. Its column names must match the table columns.
         :type df: pd.DataFrame
-        :return: A list of tuples.
-        :rtype: List[Tuple]
         """
-        df_clean: pd.DataFrame = df.astype(object).where(pd.notnull(df), None)
-        df_clean = df_clean.replace({pd.NA: None})
-        return [tuple(row) for row in df_clean.itertuples(index=False, name=None)]
+        if df.empty: return
+        if not self.cursor: raise DatabaseError("Cursor not available.")
+        df_out: pd.DataFrame = df.astype(
+            {col: dtype for col, dtype in _INTEGER_COLUMNS.items() if col in df.columns and df[col].dtype.kind in 'fO'})
+        query: str = f"COPY {table} ({', '.join(df_out.columns)}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')"
+        with tempfile.SpooledTemporaryFile(max_size=_COPY_SPOOL_MAX_BYTES, mode='w+', newline='') as buffer:
+            df_out.to_csv(buffer, index=False, header=False, na_rep='\\N')
+            buffer.seek(0)
+            try:
+                self.cursor.copy_expert(query, buffer)
+            except Exception as e:
+                if self.connection: self.connection.rollback()
+                raise DatabaseError(f"Error executing COPY into '{table}': {e}")
+
+    def _copy_to_staging(self, table: str, df: pd.DataFrame):
+        """
+        Creates a temporary staging table for a main table and copies the raw rows into it.
+
+        The staging table ``<table>_stg`` has the columns of the DataFrame (with the
+        types of the main table) but no constraints, plus a ``stg_row`` counter that
+        preserves the input order. It is dropped automatically on commit.
+
+        :param table: The name of the main table.
+        :type table: str
+        :param df: The raw, unfiltered rows for the table.
+        :type df: pd.DataFrame
+        """
+        if not self.cursor: raise DatabaseError("Cursor not available.")
+        cols_str: str = ", ".join(df.columns)
+        self.cursor.execute(
+            f"CREATE TEMP TABLE {table}_stg ON COMMIT DROP AS SELECT {cols_str} FROM {table} WITH NO DATA")
+        self.cursor.execute(f"ALTER TABLE {table}_stg ADD COLUMN stg_row BIGSERIAL")
+        self._copy_dataframe(f"{table}_stg", df)
 
-    def _insert_lookup_data(self, df_merged: pd.DataFrame) -> Tuple[Dict[str, int], Dict[str, int]]:
+    def _insert_lookup_data(self, df_merged: pd.DataFrame, commit: bool = True) -> Tuple[Dict[str, int], Dict[str, int]]:
         """
         Populates the lookup tables (detection_methods, discovery_facilities)
         and returns dictionaries mapping names to their new IDs.
@@ -148,6 +398,9 @@ class ExoplanetDBPostgres:
         :param df_merged: The merged DataFrame containing 'detection_method_name'
                           and 'facility_name' columns.
         :type df_merged: pd.DataFrame
+        :param commit: Whether to commit the lookup rows. :meth:`insert_data` passes
+                       False so they become part of its load transaction.
+        :type commit: bool
         :return: A tuple of two dictionaries: (method_map, facility_map).
         :rtype: Tuple[Dict[str, int], Dict[str, int]]
         """
@@ -155,28 +408,31 @@ class ExoplanetDBPostgres:
         method_map: Dict[str, int] = {};
         facility_map: Dict[str, int] = {}
         try:
+            # The no-op DO UPDATE makes RETURNING also yield the ids of names that already
+            # exist (DO NOTHING would skip them), so no follow-up SELECT is needed
             if 'detection_method_name' in df_merged.columns:
                 unique_methods = df_merged['detection_method_name'].dropna().unique()
                 method_tuples: List[Tuple] = [(name,) for name in unique_methods]
                 if method_tuples:
-                    query = "INSERT INTO detection_methods (method_name) VALUES (%s) ON CONFLICT (method_name) DO NOTHING;"
-                    self.cursor.executemany(query, method_tuples)
-                    self.connection.commit()
-                    self.cursor.execute("SELECT method_name, method_id FROM detection_methods")
-                    method_map = {name: id_ for name, id_ in self.cursor.fetchall()}
+                    query = ("INSERT INTO detection_methods (method_name) VALUES %s "
+                             "ON CONFLICT (method_name) DO UPDATE SET method_name = EXCLUDED.method_name "
+                             "RETURNING method_name, method_id;")
+                    method_rows: List[Tuple] = self._execute_values(query, method_tuples, fetch=True)
+                    method_map = {name: id_ for name, id_ in method_rows}
                     print(f"{len(method_map)} detection methods inserted/found.")
 
             if 'facility_name' in df_merged.columns:
                 unique_facilities = df_merged['facility_name'].dropna().unique()
                 facility_tuples: List[Tuple] = [(name,) for name in unique_facilities]
                 if facility_tuples:
-                    query = "INSERT INTO discovery_facilities (facility_name) VALUES (%s) ON CONFLICT (facility_name) DO NOTHING;"
-                    self.cursor.executemany(query, facility_tuples)
-                    self.connection.commit()
-                    self.cursor.execute("SELECT facility_name, facility_id FROM discovery_facilities")
-                    facility_map = {name: id_ for name, id_ in self.cursor.fetchall()}
+                    query = ("INSERT INTO discovery_facilities (facility_name) VALUES %s "
+                             "ON CONFLICT (facility_name) DO UPDATE SET facility_name = EXCLUDED.facility_name "
+                             "RETURNING facility_name, facility_id;")
+                    facility_rows: List[Tuple] = self._execute_values(query, facility_tuples, fetch=True)
+                    facility_map = {name: id_ for name, id_ in facility_rows}
                     print(f"{len(facility_map)} discovery facilities inserted/found.")
 
+            if commit: self.connection.commit()
             return method_map, facility_map
         except Exception as e:
             self.connection.rollback()
@@ -186,12 +442,18 @@ class ExoplanetDBPostgres:
         """
         Splits the provided DataFrames and inserts all data into the 5 normalized tables.
 
+        The whole load runs as a single transaction: if any step fails, the
+        rollback also restores the previous data, and readers never see the
+        tables half loaded.
+
         This method orchestrates the entire load process:
-        1. Recreates tables.
+        1. Creates missing or outdated tables and empties the existing ones.
         2. Populates lookup tables.
-        3. Prepares and filters data for systems, stars, and planets.
-        4. Inserts data into main tables using bulk `execute_values`.
-        5. Commits the transaction.
+        3. Prepares the columns for systems, stars, and planets.
+        4. Copies the raw rows into temporary staging tables using `COPY FROM STDIN`.
+        5. Deduplicates, filters and inserts them into the main tables via `INSERT ... SELECT`.
+        6. Adds primary and foreign keys to the loaded tables.
+        7. Commits the transaction.
 
         :param df_main_merged: DataFrame containing merged data from PSCompPars and local CSV.
         :type df_main_merged: pd.DataFrame
@@ -203,8 +465,19 @@ class ExoplanetDBPostgres:
             print("Warning: No data to insert.")
             return
         try:
-            self._recreate_tables()
-            method_map, facility_map = self._insert_lookup_data(df_main_merged)
+            # The tables are rebuilt on every run, so the load transaction does not need to wait
+            # for the WAL flush on commit; SET LOCAL only applies until that commit.
+            self.cursor.execute("SET LOCAL synchronous_commit = OFF")
+            # temp_buffers is deliberately not raised: it cannot be changed once the (pooled)
+            # session has accessed temporary tables, e.g. the staging tables of a previous load
+            self.cursor.execute("SELECT set_config('work_mem', %s, true), set_config('maintenance_work_mem', %s, true)",
+                                (_LOAD_WORK_MEM, _LOAD_MAINTENANCE_WORK_MEM))
+
+            # Emptying the tables, lookups and main tables share one transaction (DDL is transactional
+            # in PostgreSQL), committed once at the end
+            self._ensure_current_schema()
+            self._truncate_tables()
+            method_map, facility_map = self._insert_lookup_data(df_main_merged, commit=False)
 
             print("Preparing systems data...")
             df_systems: pd.DataFrame = df_main_merged.rename(columns={'star_name_api': 'system_key'})
@@ -213,25 +486,19 @@ class ExoplanetDBPostgres:
                 'hz_conservative_outer_au', 'hz_optimistic_inner_au', 'hz_optimistic_outer_au'
             ]
             valid_system_cols: List[str] = [col for col in system_cols if col in df_systems.columns]
-            df_systems = df_systems[valid_system_cols].drop_duplicates(subset=['system_key']).dropna(
-                subset=['system_key'])
-            system_tuples: List[Tuple] = self._dataframe_to_tuples(df_systems)
+            df_systems = df_systems[valid_system_cols]
 
             print("Preparing stars data...")
             star_cols: List[str] = ['star_name', 'system_key', 'st_teff', 'st_lum', 'st_age', 'st_met']
             valid_star_cols = [col for col in star_cols if col in df_stars_api.columns]
-            df_stars: pd.DataFrame = df_stars_api[valid_star_cols].copy()
-            df_stars = df_stars[df_stars['system_key'].isin(df_systems['system_key'])]
-            df_stars = df_stars.drop_duplicates(subset=['star_name']).dropna(subset=['star_name'])
-            star_tuples: List[Tuple] = self._dataframe_to_tuples(
-                df_stars[valid_star_cols])  # Ensure correct column order
+            df_stars: pd.DataFrame = df_stars_api[valid_star_cols]
 
             print("Preparing planets data...")
             df_planets_prep: pd.DataFrame = df_main_merged.rename(columns={'star_name_api': 'star_name'})
-            df_planets_prep['method_id'] = df_planets_prep['detection_method_name'].map(
-                method_map) if 'detection_method_name' in df_planets_prep.columns else None
-            df_planets_prep['facility_id'] = df_planets_prep['facility_name'].map(
-                facility_map) if 'facility_name' in df_planets_prep.columns else None
+            df_planets_prep['method_id'] = _map_lookup_ids(
+                df_planets_prep['detection_method_name'], method_map) if 'detection_method_name' in df_planets_prep.columns else None
+            df_planets_prep['facility_id'] = _map_lookup_ids(
+                df_planets_prep['facility_name'], facility_map) if 'facility_name' in df_planets_prep.columns else None
             planet_cols: List[str] = [
                 'pl_name', 'star_name', 'method_id', 'facility_id', 'planet_type', 'discovery_year',
                 'orbital_period_days', 'orbit_semi_major_axis_au', 'planet_radius_earth_radii',
@@ -240,24 +507,44 @@ class ExoplanetDBPostgres:
             ]
             valid_planet_cols: List[str] = [col for col in planet_cols if col in df_planets_prep.columns]
             df_planets: pd.DataFrame = df_planets_prep[valid_planet_cols]
-            df_planets = df_planets.drop_duplicates(subset=['pl_name']).dropna(subset=['pl_name'])
-            df_planets = df_planets[df_planets['star_name'].isin(df_stars['star_name'])]
-            planet_tuples: List[Tuple] = self._dataframe_to_tuples(df_planets)
 
-            print(f"Inserting {len(system_tuples)} systems...")
+            # Raw rows are copied into staging tables; deduplication (first row per key wins),
+            # NULL-key removal and the parent/child filter run in PostgreSQL.
+            self._copy_to_staging('systems', df_systems)
+            self._copy_to_staging('stars', df_stars)
+            self._copy_to_staging('planets', df_planets)
+
             cols_systems_str: str = ", ".join(valid_system_cols)
-            query_systems: str = f"INSERT INTO systems ({cols_systems_str}) VALUES %s ON CONFLICT (system_key) DO NOTHING"
-            self._execute_values(query_systems, system_tuples)
+            self.cursor.execute(f"""
+                INSERT INTO systems ({cols_systems_str})
+                SELECT DISTINCT ON (system_key) {cols_systems_str}
+                FROM systems_stg
+                WHERE system_key IS NOT NULL
+                ORDER BY system_key, stg_row""")
+            print(f"{self.cursor.rowcount} systems inserted.")
 
-            print(f"Inserting {len(star_tuples)} stars...")
             cols_stars_str: str = ", ".join(valid_star_cols)
-            query_stars: str = f"INSERT INTO stars ({cols_stars_str}) VALUES %s ON CONFLICT (star_name) DO NOTHING"
-            self._execute_values(query_stars, star_tuples)
+            self.cursor.execute(f"""
+                INSERT INTO stars ({cols_stars_str})
+                SELECT DISTINCT ON (star_name) {cols_stars_str}
+                FROM stars_stg
+                WHERE star_name IS NOT NULL
+                  AND system_key IN (SELECT system_key FROM systems)
+                ORDER BY star_name, stg_row""")
+            print(f"{self.cursor.rowcount} stars inserted.")
 
-            print(f"Inserting {len(planet_tuples)} planets...")
             cols_planets_str: str = ", ".join(valid_planet_cols)
-            query_planets: str = f"INSERT INTO planets ({cols_planets_str}) VALUES %s ON CONFLICT (pl_name) DO NOTHING"
-            self._execute_values(query_planets, planet_tuples)
+            self.cursor.execute(f"""
+                INSERT INTO planets ({cols_planets_str})
+                SELECT {cols_planets_str}
+                FROM (SELECT DISTINCT ON (pl_name) {cols_planets_str}
+                      FROM planets_stg
+                      WHERE pl_name IS NOT NULL
+                      ORDER BY pl_name, stg_row) AS unique_planets
+                WHERE star_name IN (SELECT star_name FROM stars)""")
+            print(f"{self.cursor.rowcount} planets inserted.")
+
+            self._add_constraints()
 
             self.connection.commit()
             print("Data successfully inserted into all tables.")
@@ -267,11 +554,11 @@ class ExoplanetDBPostgres:
             raise DatabaseError(f"Transaction failed: {e}")
 
     def close_connection(self):
-        """Closes the database cursor and connection."""
+        """Closes the database cursor and returns the connection to the pool."""
         try:
             if self.cursor: self.cursor.close()
-            if self.connection: self.connection.close()
-            print("Database connection closed.")
+            if self.connection and self._pool: self._pool.putconn(self.connection)
+            print("Database connection returned to pool.")
         except Exception as e:
             print(f"Error closing DB connection: {e}")
         finally:
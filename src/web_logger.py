@@ -2,101 +2,217 @@
 import requests
 import re
 import pandas as pd
-from bs4 import BeautifulSoup
-from typing import List, Dict, Set
+import pyarrow.parquet as pq
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional
 from pathlib import Path
+import threading
 import time
 
-CACHE_FILE = Path('data') / 'planet_type_cache.csv'
+CACHE_FILE = Path('data') / 'planet_type_cache.parquet'
+# Anzahl paralleler Scraping-Threads; sie überbrücken nur die Antwortlatenz, das Tempo begrenzt
+# SCRAPE_MIN_INTERVAL_SECONDS
+SCRAPE_MAX_WORKERS: int = 4
+# Mindestabstand zwischen zwei Anfragen an science.nasa.gov über alle Threads hinweg (max. 5 Anfragen/s,
+# wie beim früheren seriellen Scraping mit 0.2 s Pause)
+SCRAPE_MIN_INTERVAL_SECONDS: float = 0.2
+# Nach so vielen neu gescrapten Planeten wird der Cache zwischengespeichert, damit ein
+# abgebrochener Lauf beim nächsten Start nicht von vorn beginnt
+CACHE_CHECKPOINT_INTERVAL: int = 200
+# lxml-Parser (C-Implementation) statt des reinen Python-Parsers html.parser
+_HTML_PARSER: str = "lxml"
+# CSS-Selektor des Beschreibungstexts auf den Planetenseiten
+_DESCRIPTION_SELECTOR: str = "div.custom-field span"
+# Nur die custom-field-Container in den Baum übernehmen statt der ganzen Seite; der Regex trifft
+# die Klasse auch in mehrwertigen class-Attributen ("x custom-field y")
+_DESCRIPTION_STRAINER: SoupStrainer = SoupStrainer(
+    'div', attrs={'class': re.compile(r'(^|\s)custom-field(\s|$)')})
+# Gesuchte Planetentypen: Kleinschreibung -> Originalschreibweise (wie im DB-ENUM)
+_PLANET_TYPES: Dict[str, str] = {t.lower(): t for t in ('Neptune-like', 'terrestrial', 'gas giant', 'super Earth')}
+# Eine vorkompilierte Alternation findet den ersten im Text genannten Typ in einem Durchlauf
+_PLANET_TYPE_RE: re.Pattern = re.compile('|'.join(re.escape(t) for t in _PLANET_TYPES), re.IGNORECASE)
+# Feste Kategorien der Cache-Spalte planet_type; Parquet speichert sie als Dictionary-Spalte
+_PLANET_TYPE_DTYPE: pd.CategoricalDtype = pd.CategoricalDtype([*_PLANET_TYPES.values(), 'Unknown'])
+
+# Gemeinsame Session: TCP/TLS-Verbindungen zu science.nasa.gov werden zwischen Anfragen wiederverwendet.
+# Drosselung (429) und Serverfehler (5xx) werden mit exponentiellem Backoff wiederholt; ein
+# Retry-After-Header des Servers hat dabei Vorrang
+_RETRIES: Retry = Retry(total=4, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                        allowed_methods=["GET"], raise_on_status=False)
+_SESSION: requests.Session = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=SCRAPE_MAX_WORKERS, max_retries=_RETRIES))
+_SESSION.headers.update({"User-Agent": "Mozilla/5.0 (compatible; MyExoplanetPipeline/1.0)"})
+# Prozessweiter Speicher der endgültigen Scraping-Ergebnisse (Typ oder 'Unknown'). Fehlgeschlagene
+# Abrufe liefern None und landen wie im Parquet-Cache (add_planet_type) nicht hier, sodass ein
+# späterer Aufruf bzw. der nächste Lauf sie erneut versucht
+_PLANET_TYPE_MEMO: Dict[str, str] = {}
+# Gemeinsames Rate-Limit: nächster freier Zeitpunkt (time.monotonic) für eine Anfrage
+_RATE_LIMIT_LOCK: threading.Lock = threading.Lock()
+_next_request_at: float = 0.0
 
 def load_cache(cache_path: Path) -> Dict[str, str]:
     """
-    Loads the planet type cache from a CSV file.
+    Loads the planet type cache from a Parquet file.
+
+    If the Parquet file does not exist yet, a cache CSV with the same name
+    from earlier versions is read instead; it is migrated to Parquet by the
+    next :func:`save_cache`. The parsed file is memoized per process and
+    re-read only when its modification time or size changes.
 
-    :param cache_path: The path to the cache CSV file.
+    :param cache_path: The path to the cache Parquet file.
     :type cache_path: Path
     :return: A dictionary mapping pl_name to planet_type.
     :rtype: Dict[str, str]
     """
-    if cache_path.exists():
-        try:
-            df_cache = pd.read_csv(cache_path)
-            if 'pl_name' in df_cache.columns and 'planet_type' in df_cache.columns:
-                 cache_dict = pd.Series(df_cache.planet_type.values, index=df_cache.pl_name).astype(str).to_dict()
-                 return {k: (v if v != 'nan' else 'Unknown') for k, v in cache_dict.items()}
-            else:
-                 print(f"Warnung: Cache-Datei {cache_path} fehlen Spalten 'pl_name'/'planet_type'. Starte neu.")
-        except (pd.errors.EmptyDataError, pd.errors.ParserError, IOError, Exception) as e:
-            print(f"Warnung: Cache-Datei {cache_path} konnte nicht gelesen werden. Starte neu. Fehler: {e}")
+    read_path: Path = cache_path if cache_path.exists() else cache_path.with_suffix('.csv')
+    try:
+        stat = read_path.stat()
+    except OSError:
+        return {}
+    # Kopie zurückgeben: add_planet_type erweitert das Dict, der memoisierte Inhalt bleibt unverändert
+    return dict(_read_cache_file(read_path, stat.st_mtime_ns, stat.st_size))
+
+@lru_cache(maxsize=4)
+def _read_cache_file(read_path: Path, mtime_ns: int, size: int) -> Dict[str, str]:
+    """
+    Reads a cache file (Parquet or legacy CSV) into a dictionary.
+
+    ``mtime_ns`` and ``size`` are only part of the memoization key, so a
+    rewritten file is read again.
+
+    :param read_path: The path to the cache file.
+    :type read_path: Path
+    :param mtime_ns: The file's modification time in nanoseconds.
+    :type mtime_ns: int
+    :param size: The file's size in bytes.
+    :type size: int
+    :return: A dictionary mapping pl_name to planet_type.
+    :rtype: Dict[str, str]
+    """
+    try:
+        if read_path.suffix == '.parquet':
+            # Direkt über PyArrow in ein Dict, ohne Umweg über DataFrame/Series; die Datei wird
+            # gemappt statt in einen eigenen Puffer gelesen
+            cache_columns = pq.read_table(read_path, columns=['pl_name', 'planet_type'],
+                                          memory_map=True).to_pydict()
+            return {name: (p_type if p_type is not None else 'Unknown')
+                    for name, p_type in zip(cache_columns['pl_name'], cache_columns['planet_type'])}
+        df_cache = pd.read_csv(read_path)
+        if 'pl_name' in df_cache.columns and 'planet_type' in df_cache.columns:
+             # Dict direkt aus den beiden Spalten-Arrays; fehlende Typen werden zu 'Unknown'
+             return {name: (p_type if pd.notna(p_type) else 'Unknown')
+                     for name, p_type in zip(df_cache['pl_name'].to_numpy(), df_cache['planet_type'].to_numpy())}
+        else:
+             print(f"Warnung: Cache-Datei {read_path} fehlen Spalten 'pl_name'/'planet_type'. Starte neu.")
+    except (pd.errors.EmptyDataError, pd.errors.ParserError, IOError, Exception) as e:
+        print(f"Warnung: Cache-Datei {read_path} konnte nicht gelesen werden. Starte neu. Fehler: {e}")
     return {}
 
 def save_cache(cache_path: Path, cache_data: Dict[str, str]):
     """
-    Saves the planet type cache to a CSV file.
+    Saves the planet type cache to a Parquet file.
 
-    :param cache_path: The path to the cache CSV file.
+    ``planet_type`` is written as a dictionary-encoded categorical column.
+    The file is first written under a temporary name and then atomically
+    renamed, so an interrupted run never leaves a truncated cache behind.
+
+    :param cache_path: The path to the cache Parquet file.
     :type cache_path: Path
     :param cache_data: The dictionary (pl_name -> planet_type) to save.
     :type cache_data: Dict[str, str]
     """
     try:
         df_cache = pd.DataFrame(list(cache_data.items()), columns=['pl_name', 'planet_type'])
+        df_cache['planet_type'] = df_cache['planet_type'].astype(_PLANET_TYPE_DTYPE)
         cache_path.parent.mkdir(parents=True, exist_ok=True)
-        df_cache.to_csv(cache_path, index=False, encoding='utf-8')
+        tmp_path: Path = cache_path.with_name(cache_path.name + '.tmp')
+        df_cache.to_parquet(tmp_path, engine='pyarrow', compression='snappy', index=False)
+        tmp_path.replace(cache_path)
     except IOError as e:
         print(f"Warnung: Cache-Datei {cache_path} konnte nicht gespeichert werden. Fehler: {e}")
     except Exception as e:
         print(f"Warnung: Unerwarteter Fehler beim Speichern des Caches: {e}")
 
-def get_nasa_planet_type(planet_name: str) -> str:
+def _wait_for_request_slot():
+    """
+    Blocks until the shared rate limit allows the next request to science.nasa.gov.
+
+    Each call reserves the next free slot, spaced ``SCRAPE_MIN_INTERVAL_SECONDS``
+    apart across all scraping threads, and sleeps until it is due.
+    """
+    global _next_request_at
+    with _RATE_LIMIT_LOCK:
+        now: float = time.monotonic()
+        slot: float = max(now, _next_request_at)
+        _next_request_at = slot + SCRAPE_MIN_INTERVAL_SECONDS
+    # Außerhalb des Locks warten, damit andere Threads ihren Slot reservieren können
+    time.sleep(slot - now)
+
+def get_nasa_planet_type(planet_name: str) -> Optional[str]:
     """
     Fetches a planet's description from NASA and extracts its type.
 
     Scrapes the individual planet page on science.nasa.gov, searches for
     predefined keywords ('terrestrial', 'gas giant', etc.), and returns
-    the matched type or 'Unknown'.
+    the matched type or 'Unknown' (404 or no keyword on the page). If the
+    page could not be fetched (timeout, throttling or server errors after
+    all retries, unexpected errors), None is returned instead, so callers
+    can retry the planet later rather than record it as 'Unknown'.
+    Definitive results are memoized per process; failures are not, using
+    the same None signal that keeps them out of the on-disk cache.
 
     :param planet_name: The name of the planet to scrape.
     :type planet_name: str
-    :return: The found planet type (e.g., 'gas giant') or 'Unknown'.
-    :rtype: str
+    :return: The found planet type (e.g., 'gas giant'), 'Unknown', or None if the lookup failed.
+    :rtype: Optional[str]
     """
-    planet_types: List[str] = ['Neptune-like', 'terrestrial', 'gas giant', 'super Earth']
-    time.sleep(0.2)
+    if not isinstance(planet_name, str) or not planet_name:
+        return 'Unknown'
+    memoized: Optional[str] = _PLANET_TYPE_MEMO.get(planet_name)
+    if memoized is not None:
+        return memoized
+
+    _wait_for_request_slot()
     try:
         base_url: str = "https://science.nasa.gov/exoplanet-catalog/"
-        if not isinstance(planet_name, str) or not planet_name:
-             return 'Unknown'
         formatted_name: str = planet_name.lower().replace(" ", "-")
         url: str = f"{base_url}{formatted_name}/"
-        headers: Dict[str, str] = {"User-Agent": "Mozilla/5.0 (compatible; MyExoplanetPipeline/1.0)"}
-        res: requests.Response = requests.get(url, timeout=15, headers=headers)
-
-        if res.status_code == 404:
-            return 'Unknown'
-        res.raise_for_status()
-
-        soup: BeautifulSoup = BeautifulSoup(res.content, "html.parser")
-        desc_element = soup.select_one("div.custom-field span")
-
-        if desc_element:
-            description_text: str = desc_element.get_text(strip=True).lower()
-            for p_type in planet_types:
-                if p_type.lower() in description_text:
-                    original_type: str = next(t for t in planet_types if t.lower() == p_type.lower())
-                    return original_type
+        res: requests.Response = _SESSION.get(url, timeout=15)
+
+        planet_type: str = 'Unknown'
+        if res.status_code != 404:
+            res.raise_for_status()
+
+            soup: BeautifulSoup = BeautifulSoup(res.content, _HTML_PARSER, parse_only=_DESCRIPTION_STRAINER)
+            desc_element = soup.select_one(_DESCRIPTION_SELECTOR)
+
+            if desc_element:
+                match = _PLANET_TYPE_RE.search(desc_element.get_text(strip=True))
+                if match:
+                    planet_type = _PLANET_TYPES[match.group(0).lower()]
+        _PLANET_TYPE_MEMO[planet_name] = planet_type
+        return planet_type
     except requests.exceptions.Timeout:
         print(f"Warnung: Timeout beim Scrapen von {planet_name}.")
     except requests.exceptions.RequestException as e:
         print(f"Warnung: Anfragefehler beim Scrapen von {planet_name}: {e}")
     except Exception as e:
         print(f"Warnung: Unerwarteter Fehler beim Scrapen von {planet_name}: {e}")
-    return 'Unknown'
+    return None
 
 def add_planet_type(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Enriches a DataFrame with a 'planet_type' column using CSV caching
-    and sequential scraping with progress reporting.
+    Enriches a DataFrame with a 'planet_type' column using Parquet caching
+    and parallel scraping (thread pool) with progress reporting.
+
+    The cache is checkpointed every ``CACHE_CHECKPOINT_INTERVAL`` scraped
+    planets, so an interrupted run keeps the results scraped so far. Planets
+    whose page could not be fetched are not cached; they get 'Unknown' in
+    the returned column only and are scraped again on the next run.
 
     :param df: The DataFrame to enrich (must contain 'pl_name').
     :type df: pd.DataFrame
@@ -107,40 +223,61 @@ def add_planet_type(df: pd.DataFrame) -> pd.DataFrame:
         print("Keine Daten oder 'pl_name'-Spalte zum Anreichern mit Planetentyp vorhanden.")
         return df
 
-    print("Bestimme Planetentyp (mit CSV-Cache und sequenziellem Scraping)...")
-    df_copy: pd.DataFrame = df.copy()
-    df_copy['pl_name'] = df_copy['pl_name'].astype(str).fillna('')
-    all_planet_names: Set[str] = set(df_copy['pl_name'].unique())
-    if '' in all_planet_names: all_planet_names.remove('')
+    print("Bestimme Planetentyp (mit Parquet-Cache und parallelem Scraping)...")
+    # Flache Kopie: teilt die Spalten-Arrays mit df; neue bzw. ersetzte Spalten verändern df nicht
+    df_copy: pd.DataFrame = df.copy(deep=False)
+    # Eindeutige Namen einmal vektorisiert als (sortierte) Kategorien bestimmen; sie dienen auch
+    # dem Typ-Lookup am Ende. Fehlende Namen bleiben NA (Code -1): sie werden nie gescrapt und
+    # beim Laden vom NULL-Filter der Staging-Tabelle verworfen
+    name_codes = df_copy['pl_name'].astype('category').cat
 
     planet_cache: Dict[str, str] = load_cache(CACHE_FILE)
-    cached_planets: Set[str] = set(planet_cache.keys())
-    missing_planets: List[str] = sorted(list(all_planet_names - cached_planets))
+    missing_planets: List[str] = [name for name in name_codes.categories if name and name not in planet_cache]
 
     newly_scraped_types: Dict[str, str] = {}
     if missing_planets:
-        print(f"Cache nicht gefunden für {len(missing_planets)} Planeten. Starte sequenzielles Scraping...")
+        print(f"Cache nicht gefunden für {len(missing_planets)} Planeten. "
+              f"Starte paralleles Scraping ({SCRAPE_MAX_WORKERS} Threads)...")
         scraped_count = 0
+        failed_count = 0
         total_missing = len(missing_planets)
 
-        for i, planet_name in enumerate(missing_planets):
-            planet_type = get_nasa_planet_type(planet_name)
-            newly_scraped_types[planet_name] = planet_type
-            scraped_count += 1
+        with ThreadPoolExecutor(max_workers=SCRAPE_MAX_WORKERS) as executor:
+            for planet_name, planet_type in zip(missing_planets, executor.map(get_nasa_planet_type, missing_planets)):
+                # Fehlgeschlagene Abrufe (None) nicht cachen, damit der nächste Lauf sie erneut versucht
+                if planet_type is None:
+                    failed_count += 1
+                else:
+                    newly_scraped_types[planet_name] = planet_type
+                scraped_count += 1
 
-            if scraped_count % 10 == 0 or scraped_count == total_missing:
-                print(f" Fortschritt Scraping: {scraped_count}/{total_missing} Planeten verarbeitet...")
+                if scraped_count % 10 == 0 or scraped_count == total_missing:
+                    print(f" Fortschritt Scraping: {scraped_count}/{total_missing} Planeten verarbeitet...")
+                if scraped_count % CACHE_CHECKPOINT_INTERVAL == 0 and scraped_count < total_missing:
+                    planet_cache.update(newly_scraped_types)
+                    save_cache(CACHE_FILE, planet_cache)
 
+        # Drei getrennte Ergebnisse: Typ gefunden, endgültig ohne Typ (404/kein Treffer), Abruf fehlgeschlagen
         found_new_count = len([v for v in newly_scraped_types.values() if v != 'Unknown'])
-        print(f"Scraping abgeschlossen. {found_new_count} neue Typen gefunden (von {total_missing} Versuchen).")
+        unknown_new_count = len(newly_scraped_types) - found_new_count
+        print(f"Scraping abgeschlossen ({total_missing} Versuche): {found_new_count} neue Typen gefunden, "
+              f"{unknown_new_count} ohne Typ (404/kein Treffer), {failed_count} fehlgeschlagen.")
+        if failed_count:
+            print(f"Warnung: {failed_count} Planetenseiten konnten nicht abgerufen werden; "
+                  f"sie werden nicht gecacht und beim nächsten Lauf erneut versucht.")
 
         planet_cache.update(newly_scraped_types)
         save_cache(CACHE_FILE, planet_cache)
     else:
         print("Cache-Treffer für alle Planeten. Kein Scraping notwendig.")
 
-    df_copy['planet_type'] = df_copy['pl_name'].map(planet_cache).fillna('Unknown')
-    found_count = len(df_copy[df_copy['planet_type'] != 'Unknown'])
+    # Nur fünf mögliche Werte (ENUM in der DB): als Category speichern. Der Cache-Lookup läuft nur
+    # einmal je eindeutigem Namen; die Zeilen erhalten ihren Typ per Integer-Gather über die Codes
+    # Der angehängte 'Unknown'-Eintrag ist das Ziel von Code -1 (fehlender Name)
+    type_codes, type_categories = pd.factorize(
+        name_codes.categories.map(planet_cache).fillna('Unknown').append(pd.Index(['Unknown'])))
+    df_copy['planet_type'] = pd.Categorical.from_codes(type_codes[name_codes.codes.to_numpy()], type_categories)
+    found_count = int((df_copy['planet_type'] != 'Unknown').sum())
     print(f"Planetentyp-Spalte gefüllt ({found_count} bekannte Typen).")
 
     return df_copy
\ No newline at end of file
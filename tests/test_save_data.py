@@ -326,6 +326,66 @@ class TestExoplanetDBIntegration(unittest.TestCase):
         self.assertIsNotNone(url_after, "Planet sollte nach Umbenennung gefunden werden")
         self.assertTrue(url_after.endswith("TestPlanet_A_Neu"), "Generierte URL sollte nach UPDATE aktualisiert sein")
 
+    def test_09_integer_columns_with_missing_values(self):
+        """Tests if float-typed INTEGER columns (NaN from the API or an unmapped lookup) are loaded via COPY."""
+        df_main, df_stars = self._create_dummy_data()
+        df_main['discovery_year'] = [2020.0, np.nan, 2022.0]
+        df_main.loc[df_main['pl_name'] == 'TestPlanet C', 'detection_method_name'] = np.nan
+
+        self.db.insert_data(df_main, df_stars)
+
+        self.cursor.execute("SELECT discovery_year FROM planets WHERE pl_name = 'TestPlanet A'")
+        self.assertEqual(self.cursor.fetchone()[0], 2020, "discovery_year 2020.0 sollte als INTEGER 2020 gespeichert werden")
+        self.cursor.execute("SELECT discovery_year FROM planets WHERE pl_name = 'TestPlanet B'")
+        self.assertIsNone(self.cursor.fetchone()[0], "NaN bei 'discovery_year' sollte als SQL NULL gespeichert werden")
+        self.cursor.execute("SELECT method_id FROM planets WHERE pl_name = 'TestPlanet C'")
+        self.assertIsNone(self.cursor.fetchone()[0], "Fehlende Methode sollte method_id NULL ergeben")
+
+    def test_10_failed_reload_keeps_previous_data(self):
+        """Tests if a failed reload rolls back to the previously loaded tables."""
+        df_main, df_stars = self._create_dummy_data()
+        self.db.insert_data(df_main, df_stars)
+
+        df_main.loc[df_main['pl_name'] == 'TestPlanet A', 'planet_type'] = 'UngueltigerTyp'
+        with self.assertRaises(DatabaseError, msg="Einfügen mit ungültigem ENUM sollte fehlschlagen"):
+            self.db.insert_data(df_main, df_stars)
+
+        self.cursor.execute("SELECT COUNT(*) FROM planets")
+        self.assertEqual(self.cursor.fetchone()[0], 3,
+                         "Nach fehlgeschlagenem Neuladen sollten die zuvor geladenen Planeten erhalten bleiben")
+        self.cursor.execute("SELECT COUNT(*) FROM detection_methods")
+        self.assertGreater(self.cursor.fetchone()[0], 0,
+                           "Nach fehlgeschlagenem Neuladen sollten die Lookup-Tabellen erhalten bleiben")
+
+    def test_11_reload_keeps_dependent_views(self):
+        """Tests if a regular load empties the tables without dropping views built on them."""
+        df_main, df_stars = self._create_dummy_data()
+        self.db.insert_data(df_main, df_stars)
+        self.cursor.execute("CREATE VIEW v_test_planet_names AS SELECT pl_name FROM planets")
+        self.db.connection.commit()
+
+        self.db.insert_data(df_main, df_stars)
+
+        self.cursor.execute("SELECT COUNT(*) FROM v_test_planet_names")
+        self.assertEqual(self.cursor.fetchone()[0], 3, "View sollte nach erneutem Laden erhalten und befüllt sein")
+
+    def test_12_outdated_schema_is_recreated(self):
+        """Tests if a load recreates tables whose schema version comment is missing or outdated."""
+        self.cursor.execute("ALTER TABLE planets ALTER COLUMN discovery_year TYPE INTEGER")
+        self.cursor.execute("COMMENT ON TABLE planets IS NULL")
+        self.db.connection.commit()
+
+        df_main, df_stars = self._create_dummy_data()
+        self.db.insert_data(df_main, df_stars)
+
+        self.cursor.execute("""
+            SELECT data_type FROM information_schema.columns
+            WHERE table_name = 'planets' AND column_name = 'discovery_year'
+        """)
+        self.assertEqual(self.cursor.fetchone()[0], 'smallint', "Veraltetes Schema sollte neu angelegt werden")
+        self.cursor.execute("SELECT COUNT(*) FROM planets")
+        self.assertEqual(self.cursor.fetchone()[0], 3, "Planeten sollten ins neu angelegte Schema geladen werden")
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file